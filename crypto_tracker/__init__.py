@@ -0,0 +1,3 @@
+from .core import Config, CryptoTracker, configure_logging  
+
+__all__ = ['Config', 'CryptoTracker', 'configure_logging']  
@@ -0,0 +1,571 @@
+import httpx  
+import orjson  
+import asyncio  
+import time  
+from heapq import nlargest  
+from operator import itemgetter  
+import os  
+import json  
+from datetime import datetime, timedelta, timezone  
+import logging  
+from logging.handlers import QueueHandler, QueueListener  
+import queue  
+import atexit  
+from dataclasses import dataclass, field  
+from urllib.parse import urlsplit, parse_qs  
+
+
+def configure_logging():  
+    """  
+    Configure logging; records are queued and written by a background listener thread  
+    """  
+    if logging.getLogger().handlers:  
+        return  
+
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')  
+    log_handlers = [  
+        logging.StreamHandler(),  
+        logging.FileHandler('crypto_tracker.log', encoding='utf-8')  
+    ]  
+    for log_handler in log_handlers:  
+        log_handler.setFormatter(log_formatter)  
+
+    log_queue = queue.Queue(-1)  
+    log_listener = QueueListener(log_queue, *log_handlers)  
+    log_listener.start()  
+    atexit.register(log_listener.stop)  
+
+    # The queue handler only merges message args; the listener's handlers apply log_formatter  
+    logging.basicConfig(  
+        level=logging.INFO,  
+        format='%(message)s',  
+        handlers=[QueueHandler(log_queue)]  
+    )  
+
+    # httpx logs every request at INFO; keep per-poll lines out of the log  
+    logging.getLogger('httpx').setLevel(logging.WARNING)  
+
+
+# HTTP client settings; one AsyncClient keeps the CoinGecko connection warm between polls  
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=10)  
+HTTP_TIMEOUT = httpx.Timeout(10, connect=3.05)  
+HTTP_HEADERS = {'User-Agent': 'crypto-tracker/1.0'}  # httpx already negotiates gzip/deflate  
+
+# Transient CoinGecko statuses retried with exponential backoff, or after Retry-After when sent  
+RETRY_STATUSES = {429, 502, 503, 504}  
+MAX_RETRIES = 3  
+RETRY_BACKOFF = 1  # seconds  
+
+# Service account fields that must be non-empty  
+REQUIRED_CREDENTIAL_KEYS = frozenset(('type', 'project_id', 'private_key', 'client_email', 'client_id'))  
+
+# CoinGecko fields written to columns A-F of each data row  
+ROW_FIELDS = itemgetter(  
+    'name', 'symbol', 'current_price', 'market_cap', 'total_volume', 'price_change_percentage_24h'  
+)  
+
+# Rows in the data block A1:G51; the analysis section starts right below it  
+DATA_ROWS = 51  
+
+# Sheet-side number formats, applied once per worksheet so values can be written RAW:  
+# (first row, end row, first column, end column) zero-based and end-exclusive, type, pattern  
+NUMBER_FORMATS = [  
+    ((0, DATA_ROWS, 2, 3), 'CURRENCY', '$#,##0.00######'),  # C1:C51 price  
+    ((0, DATA_ROWS, 3, 5), 'NUMBER', '#,##0'),  # D1:E51 market cap, volume  
+    ((0, DATA_ROWS, 5, 6), 'NUMBER', '0.00"%"'),  # F1:F51 24h change  
+    ((0, DATA_ROWS, 6, 7), 'DATE_TIME', 'yyyy-mm-dd hh:mm:ss'),  # G1:G51 update time (IST)  
+    ((52, 57, 2, 3), 'CURRENCY', '$#,##0.00######')  # C53:C57 top 5 price  
+]  
+
+# Day zero of Sheets date serial numbers  
+SHEETS_EPOCH = datetime(1899, 12, 30)  
+
+
+@dataclass(frozen=True)  
+class Config:  
+    """  
+    Tracker settings; defaults match the original single-script deployment  
+    """  
+    # per_page may not exceed DATA_ROWS: the sheet layout has room for that many coins  
+    coingecko_url: str = 'https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=50&page=1&sparkline=false'  
+    # Replace with your actual Google Sheets URL  
+    sheet_url: str = field(default_factory=lambda: os.environ.get(  
+        'GOOGLE_SHEET_URL',  
+        'https://docs.google.com/spreadsheets/d/100qOfV1LbRyW8pruJrRUJ4HIFUn3MY_Qgz8I_YburTc/edit'  
+    ))  
+    update_interval: float = 300  # seconds between update starts  
+    retry_interval: float = 60  # seconds before retrying a failed update  
+    # CoinGecko refreshes /coins/markets every 1-2 minutes; reuse a response younger than this  
+    cache_ttl: float = 240  # seconds  
+    # Sidecar file persisting the resolved worksheet so restarts skip the worksheet lookup  
+    sheet_cache_path: str = '.sheet_cache.json'  
+
+    def __post_init__(self):  
+        # CoinGecko returns 100 coins when per_page is omitted  
+        per_page = int(parse_qs(urlsplit(self.coingecko_url).query).get('per_page', ['100'])[0])  
+        if per_page > DATA_ROWS:  
+            raise ValueError(f"coingecko_url per_page={per_page} exceeds the {DATA_ROWS} rows of the data block")  
+
+
+class CryptoTracker:  
+    # Google Sheets API scope  
+    SCOPE = [  
+        'https://spreadsheets.google.com/feeds',  
+        'https://www.googleapis.com/auth/drive'  
+    ]  
+    TZ = timezone(timedelta(hours=5, minutes=30))  # Indian Standard Time  
+
+    def __init__(self, config=None):  
+        self.config = config or Config()  
+        self.logger = logging.getLogger(self.__class__.__name__)  
+        self._response_cache = {}  # url -> {'etag', 'data', 'ts'}  
+        self._last_row_values = None  # row values last written to the sheet  
+        self.sheet = None  # worksheet handle, resolved once and reused across cycles  
+
+    def get_service_account_credentials(self):  
+        """  
+        Retrieve and validate service account credentials from environment variables  
+        """  
+        try:  
+            service_account_dict = {  
+                'type': os.environ.get('TYPE', ''),  
+                'project_id': os.environ.get('PROJECT_ID', ''),  
+                'private_key_id': os.environ.get('PRIVATE_KEY_ID', ''),  
+                'private_key': os.environ.get('PRIVATE_KEY', '').replace('\\n', '\n'),  
+                'client_email': os.environ.get('CLIENT_EMAIL', ''),  
+                'client_id': os.environ.get('CLIENT_ID', ''),  
+                'auth_uri': os.environ.get('AUTH_URI', ''),  
+                'token_uri': os.environ.get('TOKEN_URI', ''),  
+                'auth_provider_x509_cert_url': os.environ.get('AUTH_PROVIDER_X509_CERT_URL', ''),  
+                'client_x509_cert_url': os.environ.get('CLIENT_X509_CERT_URL', ''),  
+                'universe_domain': os.environ.get('UNIVERSE_DOMAIN', '')  
+            }  
+
+            # Validate required keys  
+            missing_keys = REQUIRED_CREDENTIAL_KEYS.difference(  
+                filter(service_account_dict.get, REQUIRED_CREDENTIAL_KEYS)  
+            )  
+            if missing_keys:  
+                raise ValueError(f"Missing required service account credentials: {', '.join(sorted(missing_keys))}")  
+
+            if service_account_dict['type'] != 'service_account':  
+                raise ValueError(f"Unexpected credentials type: {service_account_dict['type']}")  
+
+            self.logger.info("✅ Service account credentials successfully loaded")  
+            return service_account_dict  
+
+        except Exception as e:  
+            self.logger.error("Credentials Error: %s", e)  
+            raise  
+        
+
+
+    @staticmethod  
+    def debug_credentials():  
+            logging.basicConfig(level=logging.DEBUG)  
+            logger = logging.getLogger(__name__)  
+
+            # Updated required keys in uppercase  
+            required_keys = [  
+                'TYPE', 'PROJECT_ID', 'PRIVATE_KEY_ID', 'PRIVATE_KEY',   
+                'CLIENT_EMAIL', 'CLIENT_ID', 'AUTH_URI', 'TOKEN_URI',   
+                'AUTH_PROVIDER_X509_CERT_URL', 'CLIENT_X509_CERT_URL',   
+                'UNIVERSE_DOMAIN', 'GOOGLE_SHEET_URL'  
+            ]  
+
+            # Check environment variables  
+            logger.info("🔍 Checking Environment Variables:")  
+            missing_vars = []  
+
+            for key in required_keys:  
+                value = os.environ.get(key)  
+                if not value:  
+                    logger.warning("❌ MISSING: %s", key)  
+                    missing_vars.append(key)  
+                else:  
+                    # Mask sensitive information  
+                    masked_value = value[:5] + '...' + value[-5:] if len(value) > 10 else value  
+                    logger.info("✅ %s: %s", key, masked_value)  
+
+            # Create service account dictionary  
+            try:  
+                service_account_dict = {  
+                    'type': os.environ.get('TYPE', ''),  
+                    'project_id': os.environ.get('PROJECT_ID', ''),  
+                    'private_key_id': os.environ.get('PRIVATE_KEY_ID', ''),  
+                    'private_key': os.environ.get('PRIVATE_KEY', '').replace('\\n', '\n'),  
+                    'client_email': os.environ.get('CLIENT_EMAIL', ''),  
+                    'client_id': os.environ.get('CLIENT_ID', ''),  
+                    'auth_uri': os.environ.get('AUTH_URI', ''),  
+                    'token_uri': os.environ.get('TOKEN_URI', ''),  
+                    'auth_provider_x509_cert_url': os.environ.get('AUTH_PROVIDER_X509_CERT_URL', ''),  
+                    'client_x509_cert_url': os.environ.get('CLIENT_X509_CERT_URL', ''),  
+                    'universe_domain': os.environ.get('UNIVERSE_DOMAIN', '')  
+                }  
+
+                # Validate dictionary  
+                logger.info("🔒 Service Account Dictionary Validation")  
+                for key, value in service_account_dict.items():  
+                    if not value:  
+                        logger.warning("⚠️ Empty value for key: %s", key)  
+
+                # Attempt to create credentials file  
+                with open('service_account.json', 'w') as f:  
+                    json.dump(service_account_dict, f)  
+                
+                logger.info("✅ Temporary Credentials File Created")  
+
+            except Exception as e:  
+                logger.error("Credential Setup Failed: %s", e)  
+                raise  
+
+            if missing_vars:  
+                logger.critical("Missing %d environment variables!", len(missing_vars))  
+                raise ValueError(f"Missing environment variables: {', '.join(missing_vars)}")  
+
+    def setup_google_sheets_client(self):  
+        """  
+        Setup Google Sheets client using service account credentials  
+        """  
+        try:  
+            service_account_dict = self.get_service_account_credentials()  
+
+            # Imported lazily: gspread and oauth2client are only needed once credentials check out  
+            import gspread  
+            from oauth2client.service_account import ServiceAccountCredentials  
+            
+            # Authorize credentials  
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(  
+                service_account_dict,  
+                self.SCOPE  
+            )  
+            client = gspread.authorize(creds)  
+
+            return client  
+
+        except Exception as e:  
+            self.logger.error("Google Sheets Client Setup Failed: %s", e)  
+            raise  
+
+    async def fetch_cryptocurrency_data(self, http_client):  
+        """  
+        Fetch top 50 cryptocurrencies from CoinGecko API  
+        """  
+        url = self.config.coingecko_url  
+        
+        cached = self._response_cache.get(url)  
+        if cached and time.monotonic() - cached['ts'] < self.config.cache_ttl:  
+            return cached['data']  
+
+        headers = {'If-None-Match': cached['etag']} if cached and cached['etag'] else {}  
+
+        try:  
+            for attempt in range(MAX_RETRIES + 1):  
+                response = await http_client.get(url, headers=headers)  
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:  
+                    break  
+
+                delay = self.retry_delay(response, attempt)  
+                if delay is None:  
+                    break  
+                await asyncio.sleep(delay)  
+
+            if response.status_code == 304:  
+                cached['ts'] = time.monotonic()  
+                return cached['data']  
+
+            response.raise_for_status()  
+            data = orjson.loads(response.content)  
+            self._response_cache[url] = {  
+                'etag': response.headers.get('ETag'),  
+                'data': data,  
+                'ts': time.monotonic()  
+            }  
+            return data  
+        
+        except httpx.HTTPError as e:  
+            self.logger.error("API Fetch Error: %s", e)  
+            raise  
+
+    def retry_delay(self, response, attempt):  
+        """  
+        Seconds to wait before retrying a CoinGecko response in this cycle, or None to  
+        leave it to the retry_interval path  
+        """  
+        retry_after = response.headers.get('Retry-After')  
+        if retry_after is not None:  
+            try:  
+                delay = float(retry_after)  
+            except ValueError:  
+                return None  # HTTP-date form; the next cycle is late enough  
+
+            return delay if delay <= self.config.retry_interval else None  
+
+        # A rate limit without Retry-After would just burn more of the quota  
+        if response.status_code == 429:  
+            return None  
+
+        return RETRY_BACKOFF * 2 ** attempt  
+
+    def analyze_crypto_data(self, data):  
+        """  
+        Perform data analysis on cryptocurrency data  
+        """  
+        try:  
+            # Single pass: price sum and 24h change extremes  
+            price_sum = 0.0  
+            highest_change = float('-inf')  
+            lowest_change = float('inf')  
+
+            for coin in data:  
+                price_sum += coin['current_price']  
+
+                change = coin['price_change_percentage_24h']  
+                if change > highest_change:  
+                    highest_change = change  
+                if change < lowest_change:  
+                    lowest_change = change  
+
+            # Top 5 by market cap via partial sort  
+            top_5_data = [  
+                [coin['name'], coin['symbol'], coin['current_price']]   
+                for coin in nlargest(5, data, key=itemgetter('market_cap'))  
+            ]  
+
+            return {  
+                'top_5': top_5_data,  
+                'average_price': price_sum / len(data),  
+                'highest_change': highest_change,  
+                'lowest_change': lowest_change  
+            }  
+
+        except Exception as e:  
+            self.logger.error("Data Analysis Error: %s", e)  
+            raise  
+
+    def open_sheet(self, client):  
+        """  
+        Resolve the worksheet that receives the cryptocurrency data  
+        """  
+        try:  
+            from gspread import Worksheet  
+            from gspread.utils import extract_id_from_url  
+
+            spreadsheet_id = extract_id_from_url(self.config.sheet_url)  
+            cached = self.load_sheet_cache()  
+            # Formats are only applied on a fresh lookup, so a sidecar written for other formats is ignored  
+            if (cached and cached['spreadsheet_id'] == spreadsheet_id  
+                    and cached.get('number_formats') == repr(NUMBER_FORMATS)):  
+                # Rebuild the handle from the persisted properties instead of listing worksheets  
+                return Worksheet(client.open_by_key(spreadsheet_id), cached['worksheet'])  
+
+            sheet = client.open_by_url(self.config.sheet_url).sheet1  
+            self.apply_number_formats(sheet)  
+            self.save_sheet_cache(sheet)  
+            return sheet  
+
+        except Exception as e:  
+            self.logger.error("Google Sheet Open Error: %s", e)  
+            raise  
+
+    def load_sheet_cache(self):  
+        """  
+        Read the persisted worksheet reference, or None if missing or unreadable;  
+        a malformed sidecar is removed so it can't fail every later lookup  
+        """  
+        try:  
+            with open(self.config.sheet_cache_path, encoding='utf-8') as f:  
+                cached = json.load(f)  
+
+        except OSError:  
+            return None  
+
+        except ValueError:  
+            cached = None  
+
+        try:  
+            if 'spreadsheet_id' in cached and {'sheetId', 'title'} <= cached['worksheet'].keys():  
+                return cached  
+
+        except (KeyError, TypeError, AttributeError):  
+            pass  
+
+        self.logger.warning("Discarding malformed sheet cache: %s", self.config.sheet_cache_path)  
+        self.clear_sheet_cache()  
+        return None  
+
+    def save_sheet_cache(self, sheet):  
+        """  
+        Persist the spreadsheet and worksheet ids of a freshly resolved worksheet  
+        """  
+        try:  
+            with open(self.config.sheet_cache_path, 'w', encoding='utf-8') as f:  
+                json.dump({  
+                    'spreadsheet_id': sheet.spreadsheet.id,  
+                    'worksheet': {'sheetId': sheet.id, 'title': sheet.title, 'index': sheet.index},  
+                    'number_formats': repr(NUMBER_FORMATS)  
+                }, f)  
+
+        except OSError as e:  
+            self.logger.warning("Sheet cache write failed: %s", e)  
+
+    def clear_sheet_cache(self):  
+        """  
+        Forget the persisted worksheet reference  
+        """  
+        try:  
+            os.remove(self.config.sheet_cache_path)  
+
+        except FileNotFoundError:  
+            pass  
+
+    def apply_number_formats(self, sheet):  
+        """  
+        Format the numeric columns on the sheet so per-poll writes carry plain numbers  
+        """  
+        sheet.spreadsheet.batch_update({  
+            'requests': [  
+                {  
+                    'repeatCell': {  
+                        'range': {  
+                            'sheetId': sheet.id,  
+                            'startRowIndex': start_row,  
+                            'endRowIndex': end_row,  
+                            'startColumnIndex': start_column,  
+                            'endColumnIndex': end_column  
+                        },  
+                        'cell': {'userEnteredFormat': {'numberFormat': {'type': format_type, 'pattern': pattern}}},  
+                        'fields': 'userEnteredFormat.numberFormat'  
+                    }  
+                }  
+                for (start_row, end_row, start_column, end_column), format_type, pattern in NUMBER_FORMATS  
+            ]  
+        })  
+
+    def is_sheet_gone(self, error):  
+        """  
+        Whether an error means the cached worksheet handle no longer resolves  
+        """  
+        from gspread.exceptions import APIError  
+
+        if not isinstance(error, APIError):  
+            return False  
+
+        # gspread prefixes every range with the tab title, so a renamed or deleted tab  
+        # (live or persisted in the sidecar) surfaces as an unparseable-range 400  
+        status = error.response.status_code  
+        return status in (404, 410) or (status == 400 and 'Unable to parse range' in str(error))  
+
+    def update_google_sheet(self, sheet, row_values, analyzed_data):  
+        """  
+        Update Google Sheet with cryptocurrency data (row_values: ROW_FIELDS tuple per coin)  
+        """  
+        try:  
+            # Prepare rows with cryptocurrency data; the IST timestamp goes in as a  
+            # date serial number so the sheet keeps sorting and filtering it as a date  
+            now = datetime.now(self.TZ).replace(tzinfo=None)  
+            timestamp = (now - SHEETS_EPOCH).total_seconds() / 86400  
+            rows = [[*values, timestamp] for values in row_values]  
+            # Blank the rest of A1:G51 so a short response leaves no stale rows behind  
+            rows += [[''] * 7] * (DATA_ROWS - len(rows))  
+
+            # Analysis section as one block: header (52), top 5 (53-57), blank (58), stats (59-61)  
+            top_5 = analyzed_data['top_5']  
+            analysis = [  
+                ["Top 5 Cryptocurrencies by Market Cap:"],  
+                *top_5,  
+                *[['', '', '']] * (5 - len(top_5)),  
+                [''],  
+                [f"Average price: ${analyzed_data['average_price']:.2f}"],  
+                [f"Highest 24h change: {analyzed_data['highest_change']:.2f}%"],  
+                [f"Lowest 24h change: {analyzed_data['lowest_change']:.2f}%"]  
+            ]  
+
+            # Write data and analysis section in a single values.batchUpdate request.  
+            # Every range is overwritten each cycle, so no separate clear is needed.  
+            # Values go in RAW: numbers are already typed and formatted sheet-side.  
+            sheet.batch_update(  
+                [  
+                    {'range': f'A1:G{DATA_ROWS}', 'values': rows},  
+                    {'range': 'A52:C61', 'values': analysis}  
+                ],  
+                value_input_option='RAW'  
+            )  
+
+            self.logger.info("Google Sheet updated successfully")  
+
+        except Exception as e:  
+            self.logger.error("Google Sheet Update Error: %s", e)  
+            raise  
+
+    async def run_async(self):  
+        """  
+        Polling loop; fetches market data and writes it to the cached worksheet  
+        """  
+        # Setup Google Sheets client  
+        client = await asyncio.to_thread(self.setup_google_sheets_client)  
+
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS, retries=MAX_RETRIES)  
+        async with httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT, headers=HTTP_HEADERS) as http_client:  
+            next_deadline = time.monotonic()  
+
+            while True:  
+                try:  
+                    if self.sheet is None:  
+                        # Fetch cryptocurrency data while resolving the worksheet  
+                        crypto_data, sheet = await asyncio.gather(  
+                            self.fetch_cryptocurrency_data(http_client),  
+                            asyncio.to_thread(self.open_sheet, client),  
+                            return_exceptions=True  
+                        )  
+
+                        # Keep a resolved worksheet even if the fetch failed; the sheet error  
+                        # is raised first so a stale worksheet reference gets dropped  
+                        if not isinstance(sheet, BaseException):  
+                            self.sheet = sheet  
+                        for result in (sheet, crypto_data):  
+                            if isinstance(result, BaseException):  
+                                raise result  
+                    else:  
+                        # Fetch cryptocurrency data  
+                        crypto_data = await self.fetch_cryptocurrency_data(http_client)  
+
+                    # Extract the written fields once; they feed both the change check and the rows  
+                    row_values = tuple(map(ROW_FIELDS, crypto_data))  
+
+                    # Skip the sheet write when none of the written fields changed  
+                    if row_values == self._last_row_values:  
+                        self.logger.info("Market data unchanged, skipping sheet update")  
+                    else:  
+                        # Analyze data  
+                        analyzed_data = self.analyze_crypto_data(crypto_data)  
+
+                        # Update Google Sheet  
+                        await asyncio.to_thread(self.update_google_sheet, self.sheet, row_values, analyzed_data)  
+                        self._last_row_values = row_values  
+
+                    # Schedule from the previous deadline so update time doesn't stretch the period;  
+                    # an overrun starts the next cycle immediately  
+                    next_deadline = max(next_deadline + self.config.update_interval, time.monotonic())  
+                    self.logger.info("Waiting %.0f seconds before next update...", next_deadline - time.monotonic())  
+
+                except Exception as inner_error:  
+                    self.logger.error("Inner loop error: %s", inner_error)  
+                    if self.is_sheet_gone(inner_error):  
+                        # Re-resolve the worksheet and rewrite it on the next attempt  
+                        self.sheet = None  
+                        self._last_row_values = None  
+                        self.clear_sheet_cache()  
+                    next_deadline = time.monotonic() + self.config.retry_interval  # Wait a minute before retrying  
+
+                await asyncio.sleep(next_deadline - time.monotonic())  
+
+    def run(self):  
+        """  
+        Main execution method  
+        """  
+        try:  
+            asyncio.run(self.run_async())  
+
+        except Exception as e:  
+            self.logger.critical("Critical error: %s", e)  